@@ -0,0 +1,270 @@
+"""
+Read-only JSON API over the dashboard snapshot, for tools that want the
+dashboard's numbers without scraping Streamlit.
+
+    python api_server.py --port 8502
+
+Endpoints (all GET):
+    /current                  latest score, rating, streak, percentile
+    /series                   per-ticker date/close/fg_score/fg_bucket
+                              ?ticker=SPY,QQQ&start=2020-01-01&end=2020-12-31
+                              &columns=close,fg_score
+    /bucket-stats             forward-return stats per ticker and bucket
+                              ?grouping=score|pct&ticker=SPY&columns=avg_fwd5
+
+ETags are derived from the snapshot version, so clients revalidate with
+If-None-Match and get 304 until the pipeline writes a new snapshot. The
+gzip representation carries its own ETag ("…-gz").
+Serialized (and gzipped) bodies are kept in an LRU keyed by version and
+query, so repeated polls never touch numpy.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+import snapshot
+
+CACHE_SIZE   = 256
+GZIP_MIN     = 1024          # bytes; smaller bodies aren't worth compressing
+SERIES_COLS  = ("close", "fg_score", "fg_bucket")
+
+
+class BadRequest(Exception):
+    pass
+
+
+class SnapshotStore:
+    """Current snapshot plus its version; reloads when the file changes."""
+
+    def __init__(self, path=snapshot.SNAPSHOT_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.snap = None
+        self.version = None
+
+    def get(self):
+        st = self.path.stat()
+        with self.lock:
+            if (st.st_mtime_ns, st.st_size) != self.stamp:
+                snap = snapshot.load_snapshot(self.path)
+                # Version and stamp describe the exact bytes that were mapped
+                self.version = hashlib.sha1(snap["buffer"]).hexdigest()[:16]
+                self.stamp = snap["stat"]
+                self.snap = snap
+            return self.snap, self.version
+
+
+class ResponseCache:
+    """LRU of (etag, body, gzipped body) keyed by snapshot version + query."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                return self.items[key]
+        return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+
+def _list_param(params, name):
+    values = []
+    for v in params.get(name, []):
+        values += [x.strip() for x in v.split(",") if x.strip()]
+    return values
+
+
+def _date_param(params, name):
+    value = params.get(name, [None])[-1]
+    if value is None:
+        return None
+    try:
+        return np.datetime64(value, "D")
+    except ValueError:
+        raise BadRequest(f"{name} must be YYYY-MM-DD")
+
+
+def current(snap, params):
+    keys = ("current_date", "current_score", "current_rating", "current_pct",
+            "current_pct_bucket", "days_in_streak", "total_days_for_bucket")
+    return {k: snap[k] for k in keys}
+
+
+def series(snap, params):
+    tickers = _list_param(params, "ticker") or sorted(snap["tickers"])
+    columns = _list_param(params, "columns") or list(SERIES_COLS)
+    unknown = [t for t in tickers if t not in snap["tickers"]]
+    if unknown:
+        raise BadRequest(f"unknown ticker(s): {', '.join(unknown)}")
+    bad = [c for c in columns if c not in SERIES_COLS]
+    if bad:
+        raise BadRequest(f"unknown column(s): {', '.join(bad)}")
+    start, end = _date_param(params, "start"), _date_param(params, "end")
+
+    data = snap["data"]
+    buckets = np.array(snap["buckets"], dtype=object)
+    out = {}
+    for t in tickers:
+        rows = snapshot.ticker_slice(snap, t)
+        dates = data["date"][rows]
+        # Dates are sorted within a ticker, so the range is a slice
+        lo = np.searchsorted(dates, start, "left") if start is not None else 0
+        hi = np.searchsorted(dates, end, "right") if end is not None else len(dates)
+        sel = slice(rows.start + lo, rows.start + hi)
+
+        cols = {"date": np.datetime_as_string(data["date"][sel]).tolist()}
+        for c in columns:
+            if c == "fg_bucket":
+                cols[c] = buckets[data["bucket"][sel]].tolist()
+            else:
+                cols[c] = data[c][sel].astype(float).tolist()
+        out[t] = cols
+    return out
+
+
+def bucket_stats(snap, params):
+    grouping = params.get("grouping", ["score"])[-1]
+    if grouping not in ("score", "pct"):
+        raise BadRequest("grouping must be 'score' or 'pct'")
+    records = snap["market_bucket_stats" if grouping == "score" else "market_pct_bucket_stats"]
+
+    tickers = _list_param(params, "ticker")
+    columns = _list_param(params, "columns")
+
+    # Validate against the full table, before any filtering
+    known_tickers = {r["ticker"] for r in records}
+    known_columns = {k for r in records for k in r}
+    unknown = [t for t in tickers if t not in known_tickers]
+    if unknown:
+        raise BadRequest(f"unknown ticker(s): {', '.join(unknown)}")
+    bad = [c for c in columns if c not in known_columns]
+    if bad:
+        raise BadRequest(f"unknown column(s): {', '.join(bad)}")
+
+    if tickers:
+        records = [r for r in records if r["ticker"] in tickers]
+    if columns:
+        key_cols = ["ticker", "fg_bucket" if grouping == "score" else "fg_pct_bucket"]
+        records = [{k: r[k] for k in key_cols + columns if k in r} for r in records]
+    return records
+
+
+ROUTES = {
+    "/current": current,
+    "/series": series,
+    "/bucket-stats": bucket_stats,
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    store = None
+    cache = None
+    server_version = "FGDashboardAPI/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = ROUTES.get(url.path.rstrip("/") or "/")
+        if route is None:
+            return self._send_error(404, f"unknown endpoint {url.path}")
+
+        params = parse_qs(url.query)
+        snap, version = self.store.get()
+        # Canonical query so reordered parameters share a cache entry
+        canon = json.dumps(sorted((k, sorted(v)) for k, v in params.items()))
+        key = (version, url.path, canon)
+
+        entry = self.cache.get(key)
+        if entry is None:
+            try:
+                payload = route(snap, params)
+            except BadRequest as e:
+                return self._send_error(400, str(e))
+            body = json.dumps(payload, separators=(",", ":")).encode()
+            etag = '"' + hashlib.sha1(version.encode() + b"|" + key[1].encode()
+                                      + b"|" + canon.encode()).hexdigest()[:20] + '"'
+            gz = gzip.compress(body, 6) if len(body) >= GZIP_MIN else None
+            entry = (etag, body, gz)
+            self.cache.put(key, entry)
+        etag, body, gz = entry
+
+        # Strong ETags must differ per content coding
+        use_gzip = gz is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        gz_etag = etag[:-1] + '-gz"'
+        sent_etag = gz_etag if use_gzip else etag
+
+        match = [m.strip() for m in self.headers.get("If-None-Match", "").split(",")]
+        if etag in match or gz_etag in match or "*" in match:
+            self.send_response(304)
+            self.send_header("ETag", sent_etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", sent_etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+            body = gz
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, code, message):
+        body = json.dumps({"error": message}).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def make_server(host="0.0.0.0", port=8502):
+    if snapshot.is_stale():
+        snapshot.build_snapshot()
+    handler = type("BoundHandler", (Handler,), {
+        "store": SnapshotStore(),
+        "cache": ResponseCache(),
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API for dashboard data")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port)
+    print(f"Serving dashboard API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
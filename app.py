@@ -1,7 +1,9 @@
+import datetime as dt
+
+import numpy as np
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+
+import snapshot
 
 st.set_page_config(page_title="Historical Fear & Greed Dashboard", layout="wide")
 
@@ -35,17 +37,28 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Loading merged dataset
-fg = pd.read_csv("data/merged_fg_prices.csv", parse_dates=["date"])
-bucket_stats = pd.read_csv("data/fg_bucket_stats.csv")
+# Loading prebuilt snapshot; building it is the pipeline's / Docker build's job
+@st.cache_resource
+def get_snapshot(mtime):
+    return snapshot.load_snapshot()
+
+try:
+    snap = get_snapshot(snapshot.SNAPSHOT_FILE.stat().st_mtime)
+except (OSError, ValueError) as e:
+    st.error(f"Dashboard snapshot unavailable ({e}). Run `python snapshot.py` to build it.")
+    st.stop()
+if snapshot.is_stale():
+    st.warning("Dashboard snapshot is older than the pipeline data. Run `python snapshot.py` to refresh it.")
+
+current_date   = snap["current_date"]
+current_score  = snap["current_score"]
+current_rating = snap["current_rating"]
 
-# Latest FG
-fg_sorted = fg.sort_values("date")
-latest = fg_sorted.iloc[-1]
+current_pct_ordinal = snap["current_pct_ordinal"]
+current_pct_bucket  = snap["current_pct_bucket"]
 
-current_date   = str(latest["date"].date())
-current_score  = int(latest["fg_score"])
-current_rating = latest["fg_bucket"]
+days_in_streak        = snap["days_in_streak"]
+total_days_for_bucket = snap["total_days_for_bucket"]
 
 RATING_COLOR = {
     "extreme fear": "#B22222",
@@ -55,19 +68,6 @@ RATING_COLOR = {
     "extreme greed": "#006400"
 }
 
-# Compute streak
-days_in_streak = 1
-for i in range(len(fg_sorted)-2, -1, -1):
-    if fg_sorted.iloc[i]["fg_bucket"] == current_rating:
-        days_in_streak += 1
-    else:
-        break
-
-# Total days
-total_days_for_bucket = int(
-    bucket_stats.loc[bucket_stats["fg_bucket"] == current_rating, "count"].iloc[0]
-)
-
 # Header
 st.title("Historical Fear & Greed Dashboard")
 st.subheader("Daily Updates for Market Sentiment, Returns, and Historical Behavior")
@@ -96,6 +96,7 @@ with col2:
             <div class="box-title">CURRENT SENTIMENT</div>
             <div class="box-value">{current_rating.upper()}</div>
             <div class="box-sub">{current_date} — Score: {current_score}</div>
+            <div class="box-sub">{current_pct_ordinal} percentile of the last 5 years</div>
         </div>
         """, unsafe_allow_html=True
 )
@@ -115,24 +116,34 @@ with col3:
 
 cols = st.columns(2)
 with cols[0]:
-    selected_ticker = st.selectbox("Ticker", sorted(fg['ticker'].unique()), index=0)
+    selected_ticker = st.selectbox("Ticker", sorted(snap["tickers"]), index=0)
+
+rows = snapshot.ticker_slice(snap, selected_ticker)
+dates = snap["data"]["date"][rows]
+years = dates.astype("datetime64[Y]").astype(int) + 1970
 with cols[1]:
-    year_options = ["All"] + [str(y) for y in sorted(fg['date'].dt.year.unique())]
+    year_options = ["All"] + [str(y) for y in np.unique(years)]
     selected_year = st.selectbox("Year", year_options, index=0)
 
-data = fg[fg['ticker'] == selected_ticker]
+mask = np.ones(len(dates), dtype=bool)
 if selected_year != "All":
-    data = data[data['date'].dt.year == int(selected_year)]
+    mask = years == int(selected_year)
 
-min_date = data['date'].min().to_pydatetime()
-max_date = data['date'].max().to_pydatetime()
+min_date = dt.datetime.combine(dates[mask].min().astype(dt.date), dt.time())
+max_date = dt.datetime.combine(dates[mask].max().astype(dt.date), dt.time())
 date_range = st.slider(
     "Zoom to Date Range",
     min_value=min_date,
     max_value=max_date,
     value=(min_date, max_date)
 )
-data = data[(data['date'] >= pd.to_datetime(date_range[0])) & (data['date'] <= pd.to_datetime(date_range[1]))]
+lo, hi = (np.datetime64(d.date(), "D") for d in date_range)
+mask &= (dates >= lo) & (dates <= hi)
+data = {
+    "date": dates[mask],
+    "close": snap["data"]["close"][rows][mask],
+    "fg_score": snap["data"]["fg_score"][rows][mask],
+}
 
 bucket_colors = {
     "extreme fear": "#8B0000",
@@ -142,6 +153,8 @@ bucket_colors = {
     "extreme greed": "#006400"
 }
 
+# plotly is only needed once a chart is drawn
+import plotly.graph_objects as go
 
 fig = go.Figure()
 
@@ -184,11 +197,69 @@ fig.update_layout(
 
 st.plotly_chart(fig, use_container_width=True)
 
+# Multi-ticker comparison, rebased to 100 at the start of the range
+st.subheader("Compare Tickers")
+
+all_tickers = snap["cumlog_tickers"]
+cal_dates = snap["data"]["cal_date"]
+cols = st.columns([2, 3])
+with cols[0]:
+    compare_tickers = st.multiselect("Tickers", all_tickers, default=all_tickers)
+with cols[1]:
+    cal_min = dt.datetime.combine(cal_dates[0].astype(dt.date), dt.time())
+    cal_max = dt.datetime.combine(cal_dates[-1].astype(dt.date), dt.time())
+    compare_range = st.slider(
+        "Comparison Range",
+        min_value=cal_min,
+        max_value=cal_max,
+        value=(cal_min, cal_max),
+        key="compare_range"
+    )
+
+if compare_tickers:
+    start, end = (d.date() for d in compare_range)
+    compare_dates, rebased = snapshot.rebased(snap, compare_tickers, start, end)
+
+    compare_fig = go.Figure()
+    for ticker, values in rebased.items():
+        compare_fig.add_trace(
+            go.Scatter(x=compare_dates, y=values, mode="lines", name=ticker, line=dict(width=1.8))
+        )
+
+    # One rectangle per bucket run, not per point
+    compare_fig.update_layout(shapes=[
+        dict(
+            type="rect", xref="x", yref="paper",
+            x0=x0, x1=x1, y0=0, y1=1,
+            fillcolor=bucket_colors[bucket], opacity=0.18,
+            line=dict(width=0), layer="below"
+        )
+        for x0, x1, bucket in snapshot.bucket_runs(snap, start, end)
+    ])
+    compare_fig.update_layout(
+        template="plotly_dark",
+        yaxis=dict(title="Rebased (start = 100)"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(compare_fig, use_container_width=True)
+else:
+    st.write("Select at least one ticker to compare.")
+
 # market bucket stats
-market_bucket_stats = pd.read_csv("data/fg_market_bucket_stats.csv")
+grouping = st.radio(
+    "Group Historical Returns By",
+    ["Score bucket", "5y percentile bucket"],
+    horizontal=True
+)
+if grouping == "Score bucket":
+    market_bucket_stats = snap["market_bucket_stats"]
+    group_col, current_group = "fg_bucket", current_rating
+else:
+    market_bucket_stats = snap["market_pct_bucket_stats"]
+    group_col, current_group = "fg_pct_bucket", current_pct_bucket
 
 return_window = st.radio(
-    f"Select Forward Return Window For Current Sentiment: {current_rating.title()}",
+    f"Select Forward Return Window For Current Sentiment: {current_group.title()}",
     ['avg_fwd1', 'avg_fwd5', 'avg_fwd20'],
     horizontal=True
 )
@@ -196,9 +267,9 @@ return_window = st.radio(
 # Display Boxes
 cols = st.columns(3)
 for i, ticker in enumerate(["DIA", "SPY", "QQQ"]):
-    sub = market_bucket_stats[market_bucket_stats['ticker'] == ticker]
-    if not sub.empty:
-        avg_return = sub[return_window].values[0] * 100  # to percentage
+    sub = [r for r in market_bucket_stats if r['ticker'] == ticker and r[group_col] == current_group]
+    if sub:
+        avg_return = sub[0][return_window] * 100  # to percentage
         label = return_window.split('_')[1]  # 'fwd1', 'fwd5', or 'fwd20' → '1', '5', '20'
         with cols[i]:
             st.markdown(f"""
@@ -211,3 +282,59 @@ for i, ticker in enumerate(["DIA", "SPY", "QQQ"]):
     else:
         with cols[i]:
             st.write(f"No data for {ticker}")
+
+
+# Simulated forward paths for current sentiment
+from monte_carlo import simulate_summary
+
+st.subheader(f"Simulated Forward Paths: {current_rating.title()}")
+
+cols = st.columns(3)
+with cols[0]:
+    sim_horizon = st.select_slider("Horizon (trading days)", options=[5, 20, 60, 120], value=20)
+with cols[1]:
+    sim_paths = st.select_slider("Paths", options=[10_000, 50_000, 100_000], value=100_000)
+with cols[2]:
+    sim_transitions = st.checkbox("Let sentiment evolve (bucket transitions)", value=False)
+
+cols = st.columns(3)
+for i, ticker in enumerate(["DIA", "SPY", "QQQ"]):
+    with cols[i]:
+        try:
+            sim = simulate_summary(current_rating, ticker, sim_horizon, sim_paths, sim_transitions)
+        except (KeyError, ValueError):
+            st.write(f"No data for {ticker}")
+            continue
+
+        fan, risk = sim["fan"], sim["risk"]
+        fan_fig = go.Figure()
+        fan_fig.add_trace(go.Scatter(x=fan["day"], y=fan["q95"] * 100, mode="lines",
+                                     line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fan_fig.add_trace(go.Scatter(x=fan["day"], y=fan["q05"] * 100, mode="lines", fill="tonexty",
+                                     fillcolor="rgba(80,250,123,0.15)", line=dict(width=0), name="5–95%"))
+        fan_fig.add_trace(go.Scatter(x=fan["day"], y=fan["q75"] * 100, mode="lines",
+                                     line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fan_fig.add_trace(go.Scatter(x=fan["day"], y=fan["q25"] * 100, mode="lines", fill="tonexty",
+                                     fillcolor="rgba(80,250,123,0.35)", line=dict(width=0), name="25–75%"))
+        fan_fig.add_trace(go.Scatter(x=fan["day"], y=fan["q50"] * 100, mode="lines",
+                                     line=dict(color="#50fa7b", width=2), name="Median"))
+        fan_fig.update_layout(
+            template="plotly_dark",
+            title=ticker,
+            xaxis=dict(title="Days ahead"),
+            yaxis=dict(title="Return (%)"),
+            height=320,
+            margin=dict(l=10, r=10, t=40, b=10),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fan_fig, use_container_width=True)
+
+        st.markdown(f"""
+            <div style="background-color:#222; border-radius:16px; padding:20px; text-align:center;">
+                <div style="font-size:14px; opacity:0.7;">VaR 95% / CVaR 95%</div>
+                <div style="font-size:22px; color:#ff5555; font-weight:700;">{risk['var_95'] * 100:.2f}% / {risk['cvar_95'] * 100:.2f}%</div>
+                <div style="font-size:14px; opacity:0.7;">VaR 99% / CVaR 99%</div>
+                <div style="font-size:22px; color:#ff5555; font-weight:700;">{risk['var_99'] * 100:.2f}% / {risk['cvar_99'] * 100:.2f}%</div>
+                <div style="font-size:14px; opacity:0.7;">P(loss) {risk['prob_down'] * 100:.1f}% over {sim_horizon} days</div>
+            </div>
+        """, unsafe_allow_html=True)
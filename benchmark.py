@@ -0,0 +1,77 @@
+import statistics
+import subprocess
+import sys
+import time
+
+REPEATS = 5
+
+# Each case runs in a fresh interpreter so import costs are cold-ish
+# (OS file cache stays warm). The timed region ends once the values the
+# header boxes need are in hand, i.e. the earliest point a first paint
+# could happen.
+STARTUP_CASES = {
+    "csv + eager imports": """
+import time; t0 = time.perf_counter()
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+fg = pd.read_csv("data/merged_fg_prices.csv", parse_dates=["date"])
+bucket_stats = pd.read_csv("data/fg_bucket_stats.csv")
+market_bucket_stats = pd.read_csv("data/fg_market_bucket_stats.csv")
+fg_sorted = fg.sort_values("date")
+current_rating = fg_sorted.iloc[-1]["fg_bucket"]
+streak = 1
+for i in range(len(fg_sorted) - 2, -1, -1):
+    if fg_sorted.iloc[i]["fg_bucket"] != current_rating:
+        break
+    streak += 1
+print(time.perf_counter() - t0)
+""",
+    "snapshot mmap": """
+import time; t0 = time.perf_counter()
+import snapshot
+snap = snapshot.load_snapshot()
+current_rating, streak = snap["current_rating"], snap["days_in_streak"]
+print(time.perf_counter() - t0)
+""",
+}
+
+
+def _run(code: str) -> float:
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(repeats: int = REPEATS) -> dict:
+    """Median seconds to first-paint data for each startup path."""
+    return {name: statistics.median(_run(code) for _ in range(repeats))
+            for name, code in STARTUP_CASES.items()}
+
+
+def bench_app_run() -> float:
+    """Seconds for one full headless run of app.py (all sections drawn)."""
+    from streamlit.testing.v1 import AppTest
+    t0 = time.perf_counter()
+    at = AppTest.from_file("app.py", default_timeout=300).run()
+    elapsed = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def main():
+    import snapshot
+    if snapshot.is_stale():
+        snapshot.build_snapshot()
+
+    print("===== Startup: time to first-paint data (median of "
+          f"{REPEATS}) =====")
+    for name, secs in bench_startup().items():
+        print(f"{name:<22} {secs * 1000:8.1f} ms")
+
+    print("\n===== Full app.py run (headless) =====")
+    print(f"{'app.py':<22} {bench_app_run() * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
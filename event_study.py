@@ -0,0 +1,175 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
+
+MERGED      = Path("data/merged_fg_prices.csv")
+DIVERGENCE  = Path("divergence_events_all_tickers.csv")
+OUT_DIR     = Path("data/analysis")
+EVENTS_FILE = OUT_DIR / "event_study_events.csv"
+PATHS_FILE  = OUT_DIR / "event_study_paths.csv"
+
+# Event window in trading days around t=0
+PRE  = 20
+POST = 60
+
+# FG score levels checked for crossings (same edges as fg_bucket)
+THRESHOLDS = (25, 45, 55, 75)
+
+# z for the normal-approximation confidence band on the mean path
+CI_Z = 1.96
+
+
+def find_bucket_transitions(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows where fg_bucket differs from the previous row of the same ticker."""
+    prev = df.groupby("ticker")["fg_bucket"].shift(1)
+    mask = prev.notna() & (df["fg_bucket"] != prev)
+    events = df.loc[mask, ["date", "ticker"]].copy()
+    events["row"] = np.flatnonzero(mask)
+    events["event_type"] = "bucket_transition"
+    events["event"] = "enter " + df.loc[mask, "fg_bucket"]
+    return events
+
+
+def find_threshold_crossings(df: pd.DataFrame, thresholds=THRESHOLDS) -> pd.DataFrame:
+    """Rows where fg_score crosses one of the thresholds, split by direction."""
+    score = df["fg_score"].to_numpy(dtype=float)
+    prev = df.groupby("ticker")["fg_score"].shift(1).to_numpy(dtype=float)
+
+    out = []
+    for level in thresholds:
+        for direction, mask in (
+            ("up", (prev < level) & (score >= level)),
+            ("down", (prev >= level) & (score < level)),
+        ):
+            rows = np.flatnonzero(mask)
+            out.append(pd.DataFrame({
+                "date": df["date"].to_numpy()[rows],
+                "ticker": df["ticker"].to_numpy()[rows],
+                "row": rows,
+                "event_type": "threshold_cross",
+                "event": f"cross {direction} {level}",
+            }))
+    return pd.concat(out, ignore_index=True)
+
+
+def find_divergence_events(df: pd.DataFrame, path: Path = DIVERGENCE) -> pd.DataFrame:
+    """
+    Onsets of bearish divergence runs from divergence_tracker.py output.
+    Consecutive divergence days are collapsed to the first day so one
+    episode contributes one window.
+    """
+    if not path.exists():
+        return pd.DataFrame(columns=["date", "ticker", "row", "event_type", "event"])
+
+    div = pd.read_csv(path, parse_dates=["date"], usecols=["date", "ticker"])
+    flags = (
+        df[["date", "ticker"]]
+        .merge(div.drop_duplicates(), on=["date", "ticker"], how="left", indicator=True)
+        ["_merge"].eq("both").to_numpy()
+    )
+
+    prev = pd.Series(flags).groupby(df["ticker"].to_numpy()).shift(1, fill_value=False)
+    mask = flags & ~prev.to_numpy(dtype=bool)
+
+    rows = np.flatnonzero(mask)
+    return pd.DataFrame({
+        "date": df["date"].to_numpy()[rows],
+        "ticker": df["ticker"].to_numpy()[rows],
+        "row": rows,
+        "event_type": "divergence",
+        "event": "bearish divergence",
+    })
+
+
+def event_window_matrix(df: pd.DataFrame, rows: np.ndarray,
+                        pre: int = PRE, post: int = POST) -> np.ndarray:
+    """
+    Cumulative return path for every event, shape (n_events, pre + post + 1),
+    normalised to 0 at t=0.
+
+    Each ticker's log-price series is padded with `pre` NaNs in front and
+    `post` NaNs behind, then all tickers are laid end to end. A strided view
+    over that buffer gives every window without copying, so all events are
+    gathered with one fancy index and windows never leak across tickers.
+    """
+    width = pre + post + 1
+    log_close = np.log(df["close"].to_numpy(dtype=float))
+    codes, _ = pd.factorize(df["ticker"])
+
+    # df is sorted by ticker, so each ticker is one contiguous block
+    pad = pre + post
+    padded = np.full(len(df) + pad * (codes.max() + 1), np.nan)
+    offsets = codes * pad + pre
+    padded[np.arange(len(df)) + offsets] = log_close
+
+    windows = sliding_window_view(padded, width)
+    starts = rows + offsets[rows] - pre
+    paths = windows[starts]                      # (n_events, width) copy
+    paths = paths - paths[:, [pre]]
+    return np.expm1(paths)
+
+
+def aggregate_paths(paths: np.ndarray, events: pd.DataFrame,
+                    pre: int = PRE) -> pd.DataFrame:
+    """Mean, median, CI and percentile bands per (event_type, event) and offset."""
+    offsets = np.arange(-pre, paths.shape[1] - pre)
+    keys = events["event_type"] + "|" + events["event"]
+    group_ids, labels = pd.factorize(keys, sort=True)
+
+    out = []
+    for g, label in enumerate(labels):
+        block = paths[group_ids == g]
+        n = np.sum(~np.isnan(block), axis=0)
+        mean = np.nanmean(block, axis=0)
+        std = np.nanstd(block, axis=0, ddof=1) if len(block) > 1 else np.full(len(offsets), np.nan)
+        se = std / np.sqrt(np.maximum(n, 1))
+        p10, median, p90 = np.nanpercentile(block, [10, 50, 90], axis=0)
+
+        event_type, event = label.split("|", 1)
+        out.append(pd.DataFrame({
+            "event_type": event_type,
+            "event": event,
+            "offset": offsets,
+            "n": n,
+            "mean": mean,
+            "median": median,
+            "ci_low": mean - CI_Z * se,
+            "ci_high": mean + CI_Z * se,
+            "p10": p10,
+            "p90": p90,
+        }))
+    return pd.concat(out, ignore_index=True)
+
+
+def main():
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    df = pd.read_csv(MERGED, parse_dates=["date"])
+    df = df.sort_values(["ticker", "date"]).reset_index(drop=True)
+
+    events = pd.concat([
+        find_bucket_transitions(df),
+        find_threshold_crossings(df),
+        find_divergence_events(df),
+    ], ignore_index=True)
+
+    paths = event_window_matrix(df, events["row"].to_numpy())
+    summary = aggregate_paths(paths, events)
+
+    # Per-event end-of-window return for drill-down
+    events = events.assign(fwd_end=paths[:, -1]).drop(columns="row")
+    events = events.sort_values(["event_type", "event", "ticker", "date"])
+    events.to_csv(EVENTS_FILE, index=False)
+    summary.to_csv(PATHS_FILE, index=False)
+
+    print(f"Saved {len(events)} events → {EVENTS_FILE}")
+    print(f"Saved event-window paths (−{PRE}…+{POST}) → {PATHS_FILE}")
+
+    print(f"\n===== Mean cumulative return at +{POST} days =====")
+    end = summary[summary["offset"] == POST]
+    print(end[["event_type", "event", "n", "mean", "median", "ci_low", "ci_high"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
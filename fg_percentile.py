@@ -0,0 +1,118 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+FG_FILE  = Path("data/fg_history.csv")
+OUT_FILE = Path("data/fg_percentile_history.csv")
+
+# Trading-day lookbacks for the rolling percentile
+LOOKBACKS = {"1y": 252, "3y": 756, "5y": 1260}
+MIN_PERIODS = 252
+
+# Percentile buckets used as an alternative to the fixed-score buckets
+PCT_EDGES  = (20, 40, 60, 80)
+PCT_LABELS = ["pct 0-20", "pct 20-40", "pct 40-60", "pct 60-80", "pct 80-100"]
+
+SCORE_MIN, SCORE_MAX = 0, 100
+
+
+class ScoreFenwick:
+    """
+    Fenwick tree of counts over integer FG scores 0-100. Keeps a sorted
+    view of a window so the percentile of any score is an O(log n) query.
+    """
+
+    def __init__(self):
+        self.size = SCORE_MAX - SCORE_MIN + 1
+        self.tree = [0] * (self.size + 1)
+        self.n = 0
+
+    def add(self, score: int, delta: int = 1):
+        i = score - SCORE_MIN + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+        self.n += delta
+
+    def count_le(self, score: int) -> int:
+        i = min(score - SCORE_MIN + 1, self.size)
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def percentile(self, score: int) -> float:
+        """Mid-rank percentile (0-100) of `score` within the window."""
+        if self.n == 0:
+            return np.nan
+        below = self.count_le(score - 1)
+        equal = self.count_le(score) - below
+        return 100.0 * (below + 0.5 * equal) / self.n
+
+
+def _clean_scores(scores) -> np.ndarray:
+    return np.clip(np.round(np.asarray(scores, dtype=float)), SCORE_MIN, SCORE_MAX).astype(int)
+
+
+def rolling_percentile(scores, window: int, min_periods: int = MIN_PERIODS,
+                       return_tree: bool = False):
+    """
+    Percentile of each day's score within the trailing `window` days
+    (today included), in one linear pass over the series. With
+    `return_tree` the final window's ScoreFenwick is returned as well, so
+    later queries against the latest window are O(log n).
+    """
+    scores = _clean_scores(scores)
+    out = np.full(len(scores), np.nan)
+    fen = ScoreFenwick()
+    for t, s in enumerate(scores):
+        fen.add(s)
+        if t >= window:
+            fen.add(scores[t - window], -1)
+        if fen.n >= min_periods:
+            out[t] = fen.percentile(s)
+    return (out, fen) if return_tree else out
+
+
+def current_percentile(fen: ScoreFenwick, score) -> float:
+    """Percentile of `score` within the window held by `fen`, in O(log n)."""
+    return fen.percentile(int(_clean_scores([score])[0]))
+
+
+def percentile_bucket(pct):
+    """Map a percentile (0-100) to one of PCT_LABELS; NaN stays NaN."""
+    pct = pd.Series(pct, dtype=float)
+    codes = np.searchsorted(PCT_EDGES, pct.to_numpy(), side="right")
+    labels = np.array(PCT_LABELS, dtype=object)[np.minimum(codes, len(PCT_LABELS) - 1)]
+    return pd.Series(np.where(pct.isna(), None, labels), index=pct.index)
+
+
+def ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def main():
+    fg = pd.read_csv(FG_FILE, parse_dates=["date"])
+    fg = fg.dropna(subset=["fg_score"]).sort_values("date").reset_index(drop=True)
+
+    out = fg[["date", "fg_score"]].copy()
+    trees = {}
+    for name, window in LOOKBACKS.items():
+        # Full windows only, so each column means what its lookback says
+        out[f"fg_pct_{name}"], trees[name] = rolling_percentile(
+            fg["fg_score"], window, min_periods=window, return_tree=True
+        )
+    out.to_csv(OUT_FILE, index=False, float_format="%.2f")
+    print(f"Saved rolling percentile history → {OUT_FILE} ({len(out)} rows)")
+
+    latest = fg.iloc[-1]
+    print(f"\n===== {latest['date'].date()} — Score: {int(round(latest['fg_score']))} =====")
+    for name in LOOKBACKS:
+        pct = current_percentile(trees[name], latest["fg_score"])
+        print(f"{name:>3} lookback: {ordinal(int(round(pct)))} percentile")
+
+
+if __name__ == "__main__":
+    main()
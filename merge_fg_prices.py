@@ -1,11 +1,16 @@
 import pandas as pd
 from pathlib import Path
 
+from fg_percentile import rolling_percentile, percentile_bucket, LOOKBACKS
+from snapshot import build_snapshot, SNAPSHOT_FILE
+
 FG_FILE     = Path("data/fg_history.csv")
 PRICE_FILE  = Path("data/prices_2011_to_today.csv")
 OUT_FILE    = Path("data/merged_fg_prices.csv")
 BUCKET_STATS_FILE  = Path("data/fg_bucket_stats.csv")
 MARKET_BUCKET_STATS_FILE = Path("data/fg_market_bucket_stats.csv")
+PCT_BUCKET_STATS_FILE        = Path("data/fg_pct_bucket_stats.csv")
+MARKET_PCT_BUCKET_STATS_FILE = Path("data/fg_market_pct_bucket_stats.csv")
 
 # Buckets for FG
 def fg_bucket(score):
@@ -15,6 +20,24 @@ def fg_bucket(score):
     if score < 75: return "greed"
     return "extreme greed"
 
+def bucket_stats(merged, by):
+    """Forward-return stats grouped by `by` (a bucket column, optionally with ticker)."""
+    return (
+        merged.dropna(subset=["fwd1","fwd5","fwd20", by[-1]])
+              .groupby(by)
+              .agg(
+                  count=("fg_score", "count"),
+                  avg_fwd1=("fwd1", "mean"),
+                  avg_fwd5=("fwd5", "mean"),
+                  avg_fwd20=("fwd20", "mean"),
+                  std_fwd20=("fwd20", "std"),
+                  min_fwd20=("fwd20", "min"),
+                  max_fwd20=("fwd20", "max")
+              )
+              .reset_index()
+              .sort_values(by)
+    )
+
 def main():
     # Load Datasets
     fg = pd.read_csv(FG_FILE, parse_dates=["date"])
@@ -30,10 +53,17 @@ def main():
     # Reassign bucket after rounding
     fg["fg_bucket"] = fg["fg_score"].apply(fg_bucket)
 
+    # Rolling 5y percentile of the score → percentile bucket. Only full 5y
+    # windows count, so the bucket stats really are "5y percentile" buckets.
+    fg = fg.dropna(subset=["fg_score"]).sort_values("date").reset_index(drop=True)
+    window = LOOKBACKS["5y"]
+    fg["fg_pct_5y"] = rolling_percentile(fg["fg_score"], window, min_periods=window).round(2)
+    fg["fg_pct_bucket"] = percentile_bucket(fg["fg_pct_5y"])
+
     # Merge sentiment + prices
     merged = pd.merge(
         prices,
-        fg[["date","fg_score","fg_rating","fg_bucket"]],
+        fg[["date","fg_score","fg_rating","fg_bucket","fg_pct_5y","fg_pct_bucket"]],
         on="date",
         how="inner"
     ).sort_values(["ticker","date"]).reset_index(drop=True)
@@ -46,6 +76,7 @@ def main():
     cols = [
         "date","ticker","close",
         "fg_score","fg_rating","fg_bucket",
+        "fg_pct_5y","fg_pct_bucket",
         "ret1","fwd1","fwd5","fwd20"
     ]
     merged = merged[cols]
@@ -71,44 +102,28 @@ def main():
     print(summary.to_string(index=False))
 
     # Classic bucket stats (all markets together)
-    bucket_summary = (
-        merged.dropna(subset=["fwd1","fwd5","fwd20"])
-              .groupby("fg_bucket")
-              .agg(
-                  count=("fg_score", "count"),
-                  avg_fwd1=("fwd1", "mean"),
-                  avg_fwd5=("fwd5", "mean"),
-                  avg_fwd20=("fwd20", "mean"),
-                  std_fwd20=("fwd20", "std"),
-                  min_fwd20=("fwd20", "min"),
-                  max_fwd20=("fwd20", "max")
-              )
-              .reset_index()
-              .sort_values("fg_bucket")
-    )
+    bucket_summary = bucket_stats(merged, ["fg_bucket"])
     bucket_summary.to_csv(BUCKET_STATS_FILE, index=False)
     print("\n===== Bucket Summary Saved → data/fg_bucket_stats.csv =====")
     print(bucket_summary.to_string(index=False))
 
     # Market-by-bucket stats (per-market/ETF, per-bucket)
-    market_bucket_summary = (
-        merged.dropna(subset=["fwd1","fwd5","fwd20"])
-              .groupby(["ticker", "fg_bucket"])
-              .agg(
-                  count=("fg_score", "count"),
-                  avg_fwd1=("fwd1", "mean"),
-                  avg_fwd5=("fwd5", "mean"),
-                  avg_fwd20=("fwd20", "mean"),
-                  std_fwd20=("fwd20", "std"),
-                  min_fwd20=("fwd20", "min"),
-                  max_fwd20=("fwd20", "max")
-              )
-              .reset_index()
-              .sort_values(["ticker","fg_bucket"])
-    )
+    market_bucket_summary = bucket_stats(merged, ["ticker", "fg_bucket"])
     market_bucket_summary.to_csv(MARKET_BUCKET_STATS_FILE, index=False)
     print("\n===== Market-by-Bucket Stats Saved → data/fg_market_bucket_stats.csv =====")
     print(market_bucket_summary.to_string(index=False))
 
+    # Same stats grouped by 5y percentile bucket instead of fixed scores
+    pct_bucket_summary = bucket_stats(merged, ["fg_pct_bucket"])
+    pct_bucket_summary.to_csv(PCT_BUCKET_STATS_FILE, index=False)
+    market_pct_bucket_summary = bucket_stats(merged, ["ticker", "fg_pct_bucket"])
+    market_pct_bucket_summary.to_csv(MARKET_PCT_BUCKET_STATS_FILE, index=False)
+    print(f"\n===== Percentile-Bucket Stats Saved → {PCT_BUCKET_STATS_FILE}, {MARKET_PCT_BUCKET_STATS_FILE} =====")
+    print(pct_bucket_summary.to_string(index=False))
+
+    # Binary snapshot the dashboard memory-maps at startup
+    build_snapshot()
+    print(f"\n===== Dashboard Snapshot Saved → {SNAPSHOT_FILE} =====")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,215 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+import snapshot
+from snapshot import BUCKETS
+
+OUT_DIR  = Path("data/analysis")
+OUT_FILE = OUT_DIR / "monte_carlo_risk.csv"
+
+BLOCK       = 5                       # trading days per bootstrap block
+FAN_QUANTS  = (0.05, 0.25, 0.50, 0.75, 0.95)
+VAR_LEVELS  = (0.95, 0.99)
+
+# Process workers only pay off for batch-sized runs; everything the
+# dashboard offers (up to 100k paths) stays in-process
+PARALLEL_MIN_PATHS = 250_000
+CHUNK_PATHS        = 25_000
+
+# One reusable worker pool, created on first use. "spawn" so workers never
+# fork a multithreaded host process such as the Streamlit server.
+_POOL = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def data_version():
+    """Identifies the snapshot on disk; part of every cache key below."""
+    st = snapshot.SNAPSHOT_FILE.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=1)
+def load_history(version):
+    """
+    Per-ticker daily log returns and bucket codes, plus the daily FG bucket
+    transition matrix, read from the dashboard snapshot (no pandas, no CSV).
+    `version` only keys the cache: a rebuilt snapshot is re-read.
+    """
+    snap = snapshot.load_snapshot()
+    data = snap["data"]
+
+    history = {}
+    for ticker in snap["tickers"]:
+        rows = snapshot.ticker_slice(snap, ticker)
+        # Plain arrays so batches pickle cleanly to worker processes
+        history[ticker] = {
+            "logret": np.array(data["logret"][rows]),
+            "bucket": np.array(data["bucket"][rows]),
+        }
+    return history, np.array(snap["transitions"])
+
+
+def _block_pools(logret: np.ndarray, bucket: np.ndarray, block: int):
+    """
+    Block start rows grouped by the bucket on the start day, laid end to end.
+    A block starting on day t uses returns t+1 … t+block, so it always
+    describes what followed a day in that bucket.
+    """
+    valid = np.isfinite(logret)
+    # Every return inside the block must exist
+    ok = np.convolve(valid[1:].astype(int), np.ones(block, dtype=int), "valid") == block
+    starts = np.flatnonzero(ok)
+
+    pools = [starts[bucket[starts] == b] for b in range(len(BUCKETS))]
+    sizes = np.array([len(p) for p in pools])
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    return np.concatenate(pools), sizes, offsets
+
+
+def _simulate_chunk(args) -> np.ndarray:
+    """Cumulative log-return paths (n_paths, horizon) for one batch."""
+    logret, pool, sizes, offsets, block_P, start_bucket, horizon, n_paths, block, seed = args
+    rng = np.random.default_rng(seed)
+    n_blocks = -(-horizon // block)
+
+    # Bucket of each block; fixed unless a transition matrix is supplied
+    states = np.full((n_paths, n_blocks), start_bucket)
+    if block_P is not None:
+        cum_P = np.cumsum(block_P, axis=1)
+        u = rng.random((n_paths, n_blocks - 1))
+        for k in range(1, n_blocks):
+            prev = states[:, k - 1]
+            nxt = (u[:, k - 1, None] > cum_P[prev]).sum(axis=1)
+            states[:, k] = np.minimum(nxt, len(block_P) - 1)
+        # Fall back to the start bucket where history has no blocks to draw
+        states[sizes[states] == 0] = start_bucket
+
+    picks = offsets[states] + (rng.random(states.shape) * sizes[states]).astype(np.int64)
+    starts = pool[picks]                                    # (n_paths, n_blocks)
+
+    rows = starts[:, :, None] + 1 + np.arange(block)        # (n_paths, n_blocks, block)
+    steps = logret[rows].reshape(n_paths, n_blocks * block)[:, :horizon]
+    return np.cumsum(steps, axis=1, dtype=np.float64).astype(np.float32)
+
+
+def simulate_paths(ticker: str, bucket: str, horizon: int, n_paths: int,
+                   use_transitions: bool = False, block: int = BLOCK,
+                   seed: int = 0, workers: int | None = None,
+                   version=None) -> np.ndarray:
+    """
+    Block-bootstrapped cumulative log-return paths, shape (n_paths, horizon).
+
+    Blocks are drawn from history days in `bucket`. With `use_transitions`
+    the bucket evolves between blocks following the empirical FG bucket
+    transition matrix, so later blocks can come from other regimes.
+    Large requests are split into batches and run across processes.
+    """
+    history, transitions = load_history(version or data_version())
+    h = history[ticker]
+    b = BUCKETS.index(bucket)
+
+    pool, sizes, offsets = _block_pools(h["logret"], h["bucket"], block)
+    if sizes[b] == 0:
+        raise ValueError(f"No {block}-day history blocks for {ticker} in '{bucket}'")
+    block_P = np.linalg.matrix_power(transitions, block) if use_transitions else None
+
+    n_chunks = max(1, -(-n_paths // CHUNK_PATHS))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes_per_chunk = np.diff(np.linspace(0, n_paths, n_chunks + 1).astype(int))
+    jobs = [
+        (h["logret"], pool, sizes, offsets, block_P, b, horizon, int(n), block, s)
+        for n, s in zip(sizes_per_chunk, seeds)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if n_paths < PARALLEL_MIN_PATHS or workers == 1 or n_chunks == 1:
+        return np.concatenate([_simulate_chunk(j) for j in jobs])
+    return np.concatenate(list(_get_pool(workers).map(_simulate_chunk, jobs)))
+
+
+def simulate_summary(bucket: str, ticker: str, horizon: int, n_paths: int,
+                     use_transitions: bool = False) -> dict:
+    """
+    Fan-chart quantiles and VaR/CVaR of simple returns for one ticker.
+    Results are cached by their arguments and the snapshot version, so
+    redrawing the dashboard with the same settings doesn't re-simulate,
+    while a pipeline rerun does.
+    """
+    return _simulate_summary(bucket, ticker, horizon, n_paths, use_transitions, data_version())
+
+
+@lru_cache(maxsize=128)
+def _simulate_summary(bucket, ticker, horizon, n_paths, use_transitions, version) -> dict:
+    paths = simulate_paths(ticker, bucket, horizon, n_paths, use_transitions, version=version)
+    simple = np.expm1(paths)
+
+    quantiles = np.quantile(simple, FAN_QUANTS, axis=0)
+    fan = {"day": np.arange(1, horizon + 1)}
+    fan.update({f"q{int(q * 100):02d}": row for q, row in zip(FAN_QUANTS, quantiles)})
+
+    terminal = np.sort(simple[:, -1])
+    risk = {}
+    for level in VAR_LEVELS:
+        k = max(1, int(np.floor((1 - level) * len(terminal))))
+        # Reported as positive losses
+        risk[f"var_{int(level * 100)}"] = -terminal[k - 1]
+        risk[f"cvar_{int(level * 100)}"] = -terminal[:k].mean()
+    risk["mean"] = terminal.mean()
+    risk["prob_down"] = (terminal < 0).mean()
+
+    return {"fan": fan, "risk": risk}
+
+
+def main():
+    import pandas as pd
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    history, transitions = load_history(data_version())
+    current_bucket = snapshot.load_snapshot()["current_rating"]
+
+    print("===== Daily FG bucket transition matrix =====")
+    print(pd.DataFrame(transitions, index=BUCKETS, columns=BUCKETS).round(3).to_string())
+
+    rows = []
+    for ticker in ["DIA", "SPY", "QQQ"]:
+        for horizon in (5, 20, 60):
+            for use_transitions in (False, True):
+                res = simulate_summary(current_bucket, ticker, horizon, 100_000, use_transitions)
+                rows.append({
+                    "ticker": ticker,
+                    "fg_bucket": current_bucket,
+                    "horizon": horizon,
+                    "transitions": use_transitions,
+                    **res["risk"],
+                })
+
+    risk = pd.DataFrame(rows)
+    risk.to_csv(OUT_FILE, index=False)
+    print(f"\n===== Simulated risk for current bucket: {current_bucket} =====")
+    print(risk.to_string(index=False))
+    print(f"\nSaved → {OUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+MERGED   = Path("data/merged_fg_prices.csv")
+OUT_DIR  = Path("data/analysis")
+OUT_FILE = OUT_DIR / "rolling_correlation.csv"
+
+HORIZONS = ("fwd1", "fwd5", "fwd20")
+WINDOWS  = (63, 126, 252, 504)   # ≈ quarter, half year, 1y, 2y of trading days
+
+# fg_score is rounded to an integer in merge_fg_prices.py
+SCORE_MIN, SCORE_MAX = 0, 100
+
+
+def rolling_pearson(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling Pearson correlation from cumulative sums, O(n) for any window.
+    Output is aligned to the last row of each window (NaN during warm-up).
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+
+    # Centre first so the cumulative sums don't lose precision
+    x = x - x.mean()
+    y = y - y.mean()
+
+    def wsum(a):
+        cs = np.concatenate(([0.0], np.cumsum(a)))
+        return cs[window:] - cs[:-window]
+
+    sx, sy = wsum(x), wsum(y)
+    sxx, syy, sxy = wsum(x * x), wsum(y * y), wsum(x * y)
+
+    cov = sxy - sx * sy / window
+    var_x = sxx - sx * sx / window
+    var_y = syy - sy * sy / window
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[window - 1:] = cov / np.sqrt(var_x * var_y)
+    return out
+
+
+class _ScoreFenwick:
+    """
+    Fenwick tree over the y-ranks of the window whose nodes hold one count
+    per FG score value. A prefix query returns, for every score value at
+    once, how many window points have y at or below a given rank.
+    """
+
+    def __init__(self, size: int, n_scores: int):
+        self.size = size
+        self.tree = np.zeros((size + 1, n_scores), dtype=np.int64)
+
+    def add(self, pos: int, score: int, delta: int):
+        i = pos + 1
+        while i <= self.size:
+            self.tree[i, score] += delta
+            i += i & -i
+
+    def prefix(self, pos: int) -> np.ndarray:
+        """Per-score counts of points with y-rank <= pos (pos may be -1)."""
+        idx = []
+        i = pos + 1
+        while i > 0:
+            idx.append(i)
+            i -= i & -i
+        return self.tree[idx].sum(axis=0)
+
+
+def rolling_spearman(score: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling Spearman correlation (mid-ranks for ties) between an integer
+    FG score and a continuous series, updated incrementally.
+
+    FG scores only take 101 values, so the window is kept as per-score
+    buckets: c[v] points with score v, and S[v] = sum of those points'
+    y-ranks within the window. When a point enters or leaves, every other
+    point's y-rank moves by 1 (or 1/2 on a tie) depending on whether its y
+    is above the changed one; _ScoreFenwick answers that per score bucket
+    in O(log n). Score mid-ranks follow from a cumulative sum of c, so
+    sum(Rx * Ry) = sum_v Rx[v] * S[v] without re-ranking the window.
+    """
+    n = len(y)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+
+    score = score.astype(np.int64) - SCORE_MIN
+    n_scores = SCORE_MAX - SCORE_MIN + 1
+
+    # Global dense ranks of y; equal values share a position
+    uniq, ypos = np.unique(y, return_inverse=True)
+    fen = _ScoreFenwick(len(uniq), n_scores)
+
+    c = np.zeros(n_scores)         # points per score value
+    S = np.zeros(n_scores)         # sum of y mid-ranks per score value
+    ties_y = 0.0                   # sum over y tie groups of (t^3 - t)
+
+    def shift(v, p, sign):
+        # Counts per score of window points below / equal to / above rank p
+        nonlocal ties_y
+        below = fen.prefix(p - 1)
+        at_or_below = fen.prefix(p)
+        equal = at_or_below - below
+        above = c - at_or_below
+        L, E = below.sum(), equal.sum()
+
+        # Others move up (insert) or down (remove); tied points by half
+        S[:] += sign * (above + 0.5 * equal)
+        # The moving point itself: mid-rank within its tie group
+        S[v] += sign * (L + 0.5 * E + 1.0)
+        ties_y += sign * (3.0 * E * E + 3.0 * E)
+
+    for t in range(n):
+        v, p = score[t], ypos[t]
+        shift(v, p, +1)
+        fen.add(p, v, +1)
+        c[v] += 1
+
+        if t >= window:
+            v_old, p_old = score[t - window], ypos[t - window]
+            fen.add(p_old, v_old, -1)
+            c[v_old] -= 1
+            shift(v_old, p_old, -1)
+
+        if t < window - 1:
+            continue
+
+        w = window
+        mean_rank = (w + 1) / 2.0
+        rx = np.cumsum(c) - c + (c + 1) / 2.0        # mid-rank of each score value
+        ties_x = np.sum(c ** 3 - c)
+        base = w * (w + 1) * (2 * w + 1) / 6.0
+
+        cov = np.dot(rx, S) - w * mean_rank ** 2
+        var_x = base - ties_x / 12.0 - w * mean_rank ** 2
+        var_y = base - ties_y / 12.0 - w * mean_rank ** 2
+        if var_x > 0 and var_y > 0:
+            out[t] = cov / np.sqrt(var_x * var_y)
+    return out
+
+
+def compute_rolling(df: pd.DataFrame, horizons=HORIZONS, windows=WINDOWS) -> pd.DataFrame:
+    """Long table of rolling correlations for every ticker, horizon and window."""
+    frames = []
+    for ticker, d in df.groupby("ticker", sort=True):
+        for h in horizons:
+            dh = d.dropna(subset=["fg_score", h])
+            x = dh["fg_score"].to_numpy(dtype=float)
+            y = dh[h].to_numpy(dtype=float)
+            for w in windows:
+                if len(dh) < w:
+                    continue
+                frames.append(pd.DataFrame({
+                    "date": dh["date"].to_numpy()[w - 1:],
+                    "ticker": ticker,
+                    "horizon": h,
+                    "window": w,
+                    "pearson": rolling_pearson(x, y, w)[w - 1:],
+                    "spearman": rolling_spearman(x, y, w)[w - 1:],
+                }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    df = pd.read_csv(MERGED, parse_dates=["date"])
+    df = df.sort_values(["ticker", "date"]).reset_index(drop=True)
+
+    rolling = compute_rolling(df)
+    rolling.to_csv(OUT_FILE, index=False, float_format="%.6f")
+    print(f"Saved rolling correlations → {OUT_FILE} ({len(rolling)} rows)")
+
+    # Latest value per series
+    latest = rolling.groupby(["ticker", "horizon", "window"]).tail(1)
+    print("\n===== Latest rolling correlation =====")
+    print(latest.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
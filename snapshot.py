@@ -0,0 +1,258 @@
+"""
+Prebuilt binary snapshot of everything the dashboard needs at startup.
+
+Layout: MAGIC, an 8-byte little-endian header length, a JSON header, then
+raw little-endian arrays each aligned to ALIGN bytes. The header holds the
+scalar values (latest score, streak, ...), the small stats tables and an
+array directory of {dtype, shape, offset}. Loading only needs numpy and
+json: the arrays are memory-mapped, not parsed.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+MERGED                       = Path("data/merged_fg_prices.csv")
+BUCKET_STATS_FILE            = Path("data/fg_bucket_stats.csv")
+MARKET_BUCKET_STATS_FILE     = Path("data/fg_market_bucket_stats.csv")
+MARKET_PCT_BUCKET_STATS_FILE = Path("data/fg_market_pct_bucket_stats.csv")
+SNAPSHOT_FILE                = Path("data/dashboard_snapshot.bin")
+
+SOURCES = (MERGED, BUCKET_STATS_FILE, MARKET_BUCKET_STATS_FILE, MARKET_PCT_BUCKET_STATS_FILE)
+
+# Bump the version whenever the set of arrays or header keys changes
+MAGIC   = b"FGSNAP2\n"
+ALIGN   = 64
+BUCKETS = ["extreme fear", "fear", "neutral", "greed", "extreme greed"]
+
+
+def build_snapshot(out: Path = SNAPSHOT_FILE) -> dict:
+    """Read the pipeline CSVs once and write the snapshot. Returns the header."""
+    import pandas as pd
+    from fg_percentile import ordinal
+
+    fg = pd.read_csv(MERGED, parse_dates=["date"])
+    fg = fg.sort_values(["ticker", "date"]).reset_index(drop=True)
+    bucket_stats = pd.read_csv(BUCKET_STATS_FILE)
+
+    # Latest FG, one row per date
+    daily = fg.drop_duplicates("date").sort_values("date").reset_index(drop=True)
+    latest = daily.iloc[-1]
+    current_rating = latest["fg_bucket"]
+
+    # Streak: consecutive trading days (not ticker rows) in the current bucket
+    same = (daily["fg_bucket"] == current_rating).to_numpy()[::-1]
+    streak = int(np.argmin(same)) if not same.all() else len(same)
+
+    total_days = bucket_stats.loc[bucket_stats["fg_bucket"] == current_rating, "count"]
+    # Same fg_history-based percentile the percentile-bucket stats were grouped by
+    current_pct = latest["fg_pct_5y"]
+    current_pct_bucket = latest["fg_pct_bucket"]
+    has_pct = pd.notna(current_pct)
+
+    # Ticker blocks are contiguous after the sort
+    tickers = sorted(fg["ticker"].unique())
+    starts = fg.groupby("ticker").indices
+    ticker_index = {t: [int(starts[t][0]), int(starts[t][-1]) + 1] for t in tickers}
+
+    arrays = {
+        "date":     fg["date"].to_numpy().astype("datetime64[D]").astype("<i8"),
+        "close":    fg["close"].to_numpy(dtype="<f8"),
+        "fg_score": fg["fg_score"].to_numpy(dtype="<f4"),
+        "bucket":   pd.Categorical(fg["fg_bucket"], categories=BUCKETS).codes.astype("i1"),
+        "logret":   np.log1p(fg["ret1"].to_numpy(dtype="<f8")),
+    }
+
+    # Daily FG bucket transition matrix (one row per date) for the simulator
+    codes = pd.Categorical(daily["fg_bucket"], categories=BUCKETS).codes
+    counts = np.zeros((len(BUCKETS), len(BUCKETS)))
+    np.add.at(counts, (codes[:-1], codes[1:]), 1)
+    # Buckets never left in the sample stay put
+    never_left = counts.sum(axis=1) == 0
+    counts[never_left] += np.eye(len(BUCKETS))[never_left]
+    transitions = counts / counts.sum(axis=1, keepdims=True)
+
+    # Shared calendar × ticker matrix of cumulative log returns. Rebasing any
+    # range is then one row subtraction per ticker instead of a recompute.
+    closes = fg.pivot(index="date", columns="ticker", values="close")[tickers].ffill()
+    log_close = np.log(closes.to_numpy(dtype=float))
+    first = log_close[np.argmax(np.isfinite(log_close), axis=0), np.arange(len(tickers))]
+    arrays["cal_date"] = closes.index.to_numpy().astype("datetime64[D]").astype("<i8")
+    arrays["cumlog"] = (log_close - first).astype("<f8")
+
+    # Run-length encoded daily FG bucket on that calendar, for chart bands
+    cal_bucket = pd.Categorical(
+        daily.set_index("date")["fg_bucket"].reindex(closes.index), categories=BUCKETS
+    ).codes
+    run_start = np.flatnonzero(np.diff(cal_bucket, prepend=-2))
+    arrays["run_start"] = run_start.astype("<i4")
+    arrays["run_len"] = np.diff(np.append(run_start, len(cal_bucket))).astype("<i4")
+    arrays["run_bucket"] = cal_bucket[run_start].astype("i1")
+
+    def records(path):
+        # Full float precision (to_json rounds to 10 digits); NaN → null
+        df = pd.read_csv(path, float_precision="round_trip")
+        return df.astype(object).where(df.notna(), None).to_dict("records")
+
+    header = {
+        "current_date": str(latest["date"].date()),
+        "current_score": int(latest["fg_score"]),
+        "current_rating": current_rating,
+        "current_pct": float(current_pct) if has_pct else None,
+        "current_pct_ordinal": ordinal(int(round(current_pct))) if has_pct else "n/a",
+        "current_pct_bucket": current_pct_bucket if has_pct else None,
+        "days_in_streak": streak,
+        "total_days_for_bucket": int(total_days.iloc[0]) if len(total_days) else 0,
+        "buckets": BUCKETS,
+        "tickers": ticker_index,
+        "cumlog_tickers": tickers,
+        "transitions": transitions.tolist(),
+        "market_bucket_stats": records(MARKET_BUCKET_STATS_FILE),
+        "market_pct_bucket_stats": records(MARKET_PCT_BUCKET_STATS_FILE),
+        "arrays": {},
+    }
+
+    # Array offsets are relative to the end of the header block
+    offset = 0
+    for name, arr in arrays.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        header["arrays"][name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+
+    blob = json.dumps(header).encode()
+    head_len = -(-(len(MAGIC) + 8 + len(blob)) // ALIGN) * ALIGN
+    blob = blob.ljust(head_len - len(MAGIC) - 8, b" ")
+
+    # Unique temp file in the target directory, so concurrent builders never
+    # share a path and the final rename is atomic
+    with tempfile.NamedTemporaryFile(dir=out.parent, prefix=out.name + ".",
+                                     suffix=".tmp", delete=False) as f:
+        tmp = Path(f.name)
+        try:
+            f.write(MAGIC)
+            f.write(len(blob).to_bytes(8, "little"))
+            f.write(blob)
+            for name, arr in arrays.items():
+                f.seek(head_len + header["arrays"][name]["offset"])
+                f.write(np.ascontiguousarray(arr).tobytes())
+        except BaseException:
+            f.close()
+            tmp.unlink(missing_ok=True)
+            raise
+    os.chmod(tmp, 0o644)
+    tmp.replace(out)
+    return header
+
+
+def _has_current_format(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def is_stale(path: Path = SNAPSHOT_FILE) -> bool:
+    """
+    True when the snapshot is missing, written in an older format, or older
+    than any of its sources.
+    """
+    if not path.exists() or not _has_current_format(path):
+        return True
+    built = path.stat().st_mtime
+    return any(src.exists() and src.stat().st_mtime > built for src in SOURCES)
+
+
+def load_snapshot(path: Path = SNAPSHOT_FILE) -> dict:
+    """
+    Header dict with an extra "data" entry of memory-mapped arrays.
+    `date` and `cal_date` are returned as datetime64[D].
+
+    Header and arrays come from one mapping of one open file, so a rebuild
+    renamed into place mid-load can't pair old offsets with new bytes.
+    "buffer" is that mapping and "stat" its (mtime_ns, size), for callers
+    that version the data they serve.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        mm = np.memmap(f, mode="r", dtype=np.uint8)
+
+    if bytes(mm[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a {MAGIC.decode().strip()} dashboard snapshot; rebuild it")
+    n = int.from_bytes(bytes(mm[len(MAGIC):len(MAGIC) + 8]), "little")
+    base = len(MAGIC) + 8 + n
+    header = json.loads(bytes(mm[len(MAGIC) + 8:base]))
+    header["buffer"] = mm
+    header["stat"] = (st.st_mtime_ns, st.st_size)
+
+    data = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        start = base + spec["offset"]
+        data[name] = mm[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+    data["date"] = data["date"].view("datetime64[D]")
+    data["cal_date"] = data["cal_date"].view("datetime64[D]")
+    header["data"] = data
+    return header
+
+
+def ticker_slice(snap: dict, ticker: str) -> slice:
+    start, stop = snap["tickers"][ticker]
+    return slice(start, stop)
+
+
+def rebased(snap: dict, tickers, start, end):
+    """
+    Prices of `tickers` rebased to 100 at the first date in [start, end].
+    Returns (dates, {ticker: values}).
+    """
+    dates = snap["data"]["cal_date"]
+    lo = np.searchsorted(dates, np.datetime64(start, "D"), "left")
+    hi = np.searchsorted(dates, np.datetime64(end, "D"), "right")
+    cols = [snap["cumlog_tickers"].index(t) for t in tickers]
+
+    block = snap["data"]["cumlog"][lo:hi, cols]
+    if len(block) == 0:
+        return dates[lo:hi], {t: np.empty(0) for t in tickers}
+    # Base per ticker: its first non-missing value in the range
+    base = block[np.argmax(np.isfinite(block), axis=0), np.arange(len(cols))]
+    values = 100.0 * np.exp(block - base)
+    return dates[lo:hi], {t: values[:, i] for i, t in enumerate(tickers)}
+
+
+def bucket_runs(snap: dict, start, end):
+    """
+    (start_date, end_date, bucket) for each FG bucket run overlapping
+    [start, end], clipped to the range. Each run ends where the next begins
+    so bands tile the x-axis without gaps.
+    """
+    d = snap["data"]
+    dates = d["cal_date"]
+    lo = np.searchsorted(dates, np.datetime64(start, "D"), "left")
+    hi = np.searchsorted(dates, np.datetime64(end, "D"), "right")
+    if hi <= lo:
+        return []
+
+    run_start = d["run_start"]
+    first = np.searchsorted(run_start, lo, "right") - 1
+    last = np.searchsorted(run_start, hi, "left")
+
+    starts = np.maximum(run_start[first:last], lo)
+    stops = np.minimum(run_start[first:last] + d["run_len"][first:last], hi)
+    # Extend each band to the next run's first day (or the range end)
+    x0 = dates[starts]
+    x1 = dates[np.minimum(stops, hi - 1)]
+    buckets = [snap["buckets"][b] for b in d["run_bucket"][first:last]]
+    return list(zip(x0, x1, buckets))
+
+
+def main():
+    header = build_snapshot()
+    size = SNAPSHOT_FILE.stat().st_size
+    print(f"Saved dashboard snapshot → {SNAPSHOT_FILE} ({size / 1024:.0f} KiB)")
+    print(f"{header['current_date']} — {header['current_rating']} ({header['current_score']}), "
+          f"streak {header['days_in_streak']} days, {header['current_pct_ordinal']} pct (5y)")
+
+
+if __name__ == "__main__":
+    main()